@@ -1,24 +1,35 @@
 """Vectorized math formulae"""
-from numba import vectorize, int64, float64
-from math import lgamma, exp, isnan, log
+from numba import njit, vectorize, int64, float64
+from math import isnan, log
+import numpy as np
 
-__all__ = ["binom", "xlogy"]
+__all__ = ["binom", "xlogy", "sum_log"]
 
 
-@vectorize([float64(int64, int64)], fastmath=True)
+@vectorize([float64(int64, int64)], fastmath=True, cache=True)
 def binom(n, k):
-    """Obtain the binomial coefficient, using a definition that is mathematically
-    equivalent but numerically stable to avoid arithmetic overflow.
+    """Obtain the binomial coefficient for integer arguments, using the
+    multiplicative recurrence C(n, k) = C(n, k-1) * (n - k + 1) / k
 
     The result of this method is "n choose k", the number of ways choose an
     (unordered) subset of k elements from a fixed set of n elements.
 
+    Only min(k, n - k) multiplications are required, and no transcendental
+    functions are evaluated.
+
     Source: https://en.wikipedia.org/wiki/Binomial_coefficient
     """
-    return exp(lgamma(n + 1) - lgamma(k + 1) - lgamma(n - k + 1))
+    if k < 0 or k > n:
+        return 0.0
+    if n - k < k:
+        k = n - k  # Use the symmetry C(n, k) = C(n, n-k)
+    result = 1.0
+    for i in range(1, k + 1):
+        result = result * (n - k + i) / i
+    return result
 
 
-@vectorize([float64(float64, float64)])
+@vectorize([float64(float64, float64)], cache=True)
 def xlogy(x, y):
     """Compute ``x*log(y)`` so that the result is 0 if ``x = 0``,
     even if y is negative
@@ -29,3 +40,15 @@ def xlogy(x, y):
         return 0
     else:
         return x * log(y)
+
+
+@njit(fastmath=True, cache=True)
+def sum_log(x):
+    """Sum of the natural logarithm of the values in the array
+
+    Accumulated directly, without allocating the intermediate array of logs.
+    """
+    total = 0.0
+    for i in range(x.size):
+        total += np.log(x[i])
+    return total
@@ -1,15 +1,39 @@
 """Vectorized forms of common PDFs and PMFs"""
 
 from spefit.common.basic import xlogy
-from numba import vectorize, int64, float64
-from math import lgamma, exp, sqrt, pi
+from numba import njit, vectorize, int64, float64
+from math import lgamma, exp, sqrt, pi, log, floor, fabs
+import numpy as np
 
-__all__ = ["poisson_logpmf", "poisson", "normal_pdf"]
+__all__ = [
+    "log_factorial",
+    "poisson_logpmf",
+    "poisson_logpmf_lut",
+    "poisson",
+    "normal_pdf",
+    "normal_mixture_pdf",
+    "chi2_sf",
+]
 
 SQRT2PI = sqrt(2.0 * pi)
+INV_SQRT2PI = 1 / SQRT2PI
 
+# Lookup table of log(k!), the peak indices of the SPE spectra are always small
+LOG_FACTORIAL = np.array([lgamma(k + 1) for k in range(256)])
 
-@vectorize([float64(float64, float64)], fastmath=True)
+
+@vectorize([float64(int64), float64(float64)], cache=True)
+def log_factorial(k):
+    """Natural logarithm of k! (i.e. lgamma(k + 1)). Integer values of
+    0 <= k < 256 are obtained from a lookup table, otherwise falls back to
+    lgamma.
+    """
+    if 0 <= k < LOG_FACTORIAL.size and k == floor(k):
+        return LOG_FACTORIAL[np.int64(k)]
+    return lgamma(k + 1)
+
+
+@vectorize([float64(float64, float64)], fastmath=True, cache=True)
 def poisson_logpmf(k, mu):
     """Poisson log-PMF, using a definition that is mathematically
     equivalent but numerically stable to avoid arithmetic overflow.
@@ -19,7 +43,21 @@ def poisson_logpmf(k, mu):
     return xlogy(k, mu) - lgamma(k + 1) - mu
 
 
-@vectorize([float64(int64, float64)], fastmath=True)
+@vectorize(
+    [float64(int64, float64), float64(float64, float64)], fastmath=True, cache=True
+)
+def poisson_logpmf_lut(k, mu):
+    """Poisson log-PMF, using the log(k!) lookup table instead of evaluating
+    lgamma when k is an integer.
+    """
+    if k < 0:
+        return -np.inf
+    return (k * log(mu) if k > 0 else 0.0) - log_factorial(k) - mu
+
+
+@vectorize(
+    [float64(int64, float64), float64(float64, float64)], fastmath=True, cache=True
+)
 def poisson(k, mu):
     """Poisson PMF, using a definition that is mathematically
     equivalent but numerically stable to avoid arithmetic overflow.
@@ -27,12 +65,15 @@ def poisson(k, mu):
     The result is the probability of observing k events for an average number
     of events per interval, lambda_.
 
+    Accepts either integer or float k, so that float arrays of k do not
+    require casting.
+
     Source: https://en.wikipedia.org/wiki/Poisson_distribution
     """
-    return exp(poisson_logpmf(k, mu))
+    return exp(poisson_logpmf_lut(k, mu))
 
 
-@vectorize([float64(float64, float64, float64)], fastmath=True)
+@vectorize([float64(float64, float64, float64)], fastmath=True, cache=True)
 def normal_pdf(x, mean, std_deviation):
     """Normal PDF
 
@@ -41,5 +82,117 @@ def normal_pdf(x, mean, std_deviation):
 
     Source: https://stackoverflow.com/questions/10847007/using-the-gaussian-probability-density-function-in-c
     """
-    u = (x - mean) / std_deviation
-    return exp(-0.5 * u ** 2) / (SQRT2PI * std_deviation)
+    inv_std_deviation = 1 / std_deviation
+    u = (x - mean) * inv_std_deviation
+    return exp(-0.5 * u ** 2) * INV_SQRT2PI * inv_std_deviation
+
+
+@njit(fastmath=True, cache=True)
+def normal_mixture_pdf(x, weight, mean, std_deviation):
+    """Weighted sum of normal PDFs
+
+    Equivalent to summing ``weight[j] * normal_pdf(x, mean[j], std_deviation[j])``
+    over j, but accumulated in place into a single result array, without a
+    temporary array per component. The inner loop over x is contiguous so
+    that it can be vectorized.
+
+    Parameters
+    ----------
+    x : ndarray
+        The x values to evaluate at
+    weight : ndarray
+        Weight of each normal component
+    mean : ndarray
+        Mean of each normal component
+    std_deviation : ndarray
+        Standard deviation of each normal component
+
+    Returns
+    -------
+    ndarray
+    """
+    n_components = weight.size
+    inv_std_deviation = np.empty(n_components)
+    amplitude = np.empty(n_components)
+    for j in range(n_components):
+        inv_std_deviation[j] = 1 / std_deviation[j]
+        amplitude[j] = weight[j] * INV_SQRT2PI * inv_std_deviation[j]
+
+    x_flat = x.ravel()
+    result = np.zeros(x_flat.size)
+    for j in range(n_components):
+        for i in range(x_flat.size):
+            u = (x_flat[i] - mean[j]) * inv_std_deviation[j]
+            result[i] += amplitude[j] * exp(-0.5 * u ** 2)
+    return result.reshape(x.shape)
+
+
+@vectorize([float64(float64, float64)], cache=True)
+def chi2_sf(x, dof):
+    """Survival function (1 - CDF) of the chi-squared distribution, i.e. the
+    regularized upper incomplete gamma function Q(dof/2, x/2).
+
+    Evaluated with the series expansion of P(a, x) when x < a + 1, and with
+    the continued fraction of Q(a, x) otherwise (Numerical Recipes 6.2).
+    The lgamma(a) normalisation is obtained from the log(k!) lookup table
+    for integer a (even dof). Both expansions need O(sqrt(a)) iterations
+    when x is close to a, so the iteration limit grows with the dof. NaN is
+    returned if they do not converge within it.
+
+    Parameters
+    ----------
+    x : float
+        Chi-squared value
+    dof : float
+        Number of degrees of freedom
+
+    Returns
+    -------
+    float
+    """
+    if not dof > 0 or x != x:
+        return np.nan
+    if x <= 0:
+        return 1.0
+    if x == np.inf:
+        return 0.0
+    a = 0.5 * dof
+    y = 0.5 * x
+    log_prefactor = a * log(y) - y - log_factorial(a - 1)
+    max_iterations = 100 + 20 * sqrt(a)
+
+    if y < a + 1:
+        term = 1 / a
+        total = term
+        n = a
+        while fabs(term) >= fabs(total) * 1e-15:
+            n += 1
+            if n - a > max_iterations:
+                return np.nan
+            term *= y / n
+            total += term
+        return 1 - total * exp(log_prefactor)
+
+    tiny = 1e-300
+    b = y + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    i = 0
+    delta = 0.0
+    while fabs(delta - 1) >= 1e-15:
+        i += 1
+        if i > max_iterations:
+            return np.nan
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        if fabs(d) < tiny:
+            d = tiny
+        c = b + an / c
+        if fabs(c) < tiny:
+            c = tiny
+        d = 1 / d
+        delta = d * c
+        h *= delta
+    return exp(log_prefactor) * h
@@ -1,4 +1,4 @@
-from spefit.common.basic import binom, xlogy
+from spefit.common.basic import binom, xlogy, sum_log
 import scipy.special as scipy_special
 import numpy as np
 from numpy.testing import assert_allclose
@@ -8,6 +8,16 @@ def test_binom():
     n = np.arange(100)
     k = np.arange(100)
     assert_allclose(binom(n, k), scipy_special.binom(n, k))
+    assert_allclose(binom(n, k // 3), scipy_special.binom(n, k // 3))
+    assert_allclose(binom(n, k + 1), scipy_special.binom(n, k + 1))
+
+
+def test_binom_scalar():
+    assert binom(10, 3) == 120
+    assert binom(10, 7) == 120
+    assert binom(10, 0) == 1
+    assert binom(10, 11) == 0
+    assert binom(10, -1) == 0
 
 
 def test_xlogy():
@@ -18,3 +28,11 @@ def test_xlogy():
         assert_allclose(xlogy(x, np.nan), scipy_special.xlogy(x, np.nan))
         assert_allclose(xlogy(np.nan, y), scipy_special.xlogy(np.nan, y))
         assert_allclose(xlogy(np.nan, np.nan), scipy_special.xlogy(np.nan, np.nan))
+
+
+def test_sum_log():
+    x = np.linspace(-100, 100, 1000)
+    with np.errstate(invalid="ignore"):
+        assert_allclose(sum_log(x), np.sum(np.log(x)))
+    x = np.linspace(1, 100, 1000)
+    assert_allclose(sum_log(x), np.sum(np.log(x)))
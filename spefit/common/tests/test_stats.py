@@ -1,5 +1,14 @@
-from spefit.common.stats import poisson, normal_pdf, poisson_logpmf
-from scipy.stats import poisson as scipy_poisson, norm as scipy_norm
+from spefit.common.stats import (
+    log_factorial,
+    poisson_logpmf,
+    poisson_logpmf_lut,
+    poisson,
+    normal_pdf,
+    normal_mixture_pdf,
+    chi2_sf,
+)
+from scipy.stats import poisson as scipy_poisson, norm as scipy_norm, chi2
+from math import lgamma
 import numpy as np
 from numpy.testing import assert_allclose as allclose
 
@@ -18,10 +27,29 @@ def test_poisson_pmf():
         compare(np.nan, np.nan)
 
 
+def test_log_factorial():
+    for k in [0, 1, 5, 100, 255, 256, 1000]:
+        allclose(log_factorial(k), lgamma(k + 1))
+        allclose(log_factorial(float(k)), lgamma(k + 1))
+    allclose(log_factorial(2.5), lgamma(3.5))
+
+
+def test_poisson_logpmf_lut():
+    for k in range(-2, 300):
+        for mu in [0.1, 1, 5, 50]:
+            allclose(poisson_logpmf_lut(k, mu), scipy_poisson.logpmf(k, mu))
+    assert poisson_logpmf_lut(0, 0) == 0
+
+
 def test_poisson():
     k = np.arange(1, 100)
     mu = np.arange(1, 100)
     allclose(poisson(k, mu), scipy_poisson.pmf(k, mu))
+    k = np.arange(-2, 10)
+    allclose(poisson(k, 0.5), scipy_poisson.pmf(k, 0.5))
+    allclose(poisson(k.astype(np.float64), 0.5), scipy_poisson.pmf(k, 0.5))
+    k = np.linspace(0, 10, 21)
+    allclose(poisson(k, 2.5), np.exp(poisson_logpmf(k, 2.5)))
 
 
 def test_normal_pdf():
@@ -29,3 +57,30 @@ def test_normal_pdf():
     mean = 0
     std = 5
     allclose(normal_pdf(x, mean, std), scipy_norm.pdf(x, mean, std))
+
+
+def test_normal_mixture_pdf():
+    x = np.linspace(-10, 10, 100)
+    weight = np.array([0.2, 0.5, 0.3])
+    mean = np.array([-1.0, 0.0, 2.0])
+    std = np.array([0.5, 1.0, 3.0])
+    expected = sum(w * scipy_norm.pdf(x, m, s) for w, m, s in zip(weight, mean, std))
+    allclose(normal_mixture_pdf(x, weight, mean, std), expected)
+    allclose(normal_mixture_pdf(x, weight[:0], mean[:0], std[:0]), 0)
+
+
+def test_chi2_sf():
+    x = np.concatenate([np.linspace(0, 5, 51), np.geomspace(5, 2000, 50)])
+    for dof in [1, 2, 3, 10, 57, 100, 1000]:
+        allclose(chi2_sf(x, dof), chi2.sf(x, dof), rtol=1e-10, atol=1e-300)
+    assert chi2_sf(-1, 5) == 1
+    assert np.isnan(chi2_sf(1, 0))
+    assert np.isnan(chi2_sf(np.nan, 5))
+
+    # Infinite chi2 (e.g. a BinnedNLL where the PDF underflows in a filled bin)
+    assert chi2_sf(np.inf, 5) == chi2.sf(np.inf, 5) == 0
+
+    # Large dof require more iterations than the small dof above
+    for dof in [1e4, 1e5, 1e6]:
+        x = dof * np.array([0.9, 0.99, 1, 1.01, 1.1])
+        allclose(chi2_sf(x, dof), chi2.sf(x, dof), rtol=1e-8, atol=1e-300)
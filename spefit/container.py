@@ -1,11 +1,107 @@
-from typing import Tuple
+from typing import Tuple, List
+from numba import njit
 import numpy as np
 
-__all__ = ["ChargeContainer"]
+__all__ = ["_filter_and_hist", "_hist_columns", "ChargeContainer"]
+
+
+@njit(cache=True)
+def _filter_and_hist(values, edges, retain_values=True):
+    """Exclude the values outside the range of the uniform bin edges, and
+    histogram the remaining values, in a single pass over the array.
+
+    Bin assignment follows ``np.histogram``: bins are half-open, except the
+    last, which also includes the upper edge.
+
+    Parameters
+    ----------
+    values : ndarray
+        Array of charges
+    edges : ndarray
+        Uniformly spaced bin edges
+    retain_values : bool
+        If False, the values within the range are not stored, and an empty
+        array is returned in their place
+
+    Returns
+    -------
+    filtered : ndarray
+        Values within the range of the edges
+    hist : ndarray
+        Counts in each bin
+    """
+    n_bins = edges.size - 1
+    norm = n_bins / (edges[-1] - edges[0])
+    filtered = np.empty(values.size if retain_values else 0, dtype=values.dtype)
+    hist = np.zeros(n_bins, dtype=np.int64)
+    n_filtered = 0
+    for i in range(values.size):
+        index = _bin_index(values[i], edges, norm)
+        if index < 0:
+            continue
+        if retain_values:
+            filtered[n_filtered] = values[i]
+            n_filtered += 1
+        hist[index] += 1
+    return filtered[:n_filtered], hist
+
+
+@njit(cache=True)
+def _hist_columns(values, edges):
+    """Histogram each column of a 2D array (e.g. the charges of each pixel),
+    in a single row-major pass over the array.
+
+    Bin assignment is identical to ``_filter_and_hist``.
+
+    Parameters
+    ----------
+    values : ndarray
+        Array of charges with shape (n_events, n_columns)
+    edges : ndarray
+        Uniformly spaced bin edges
+
+    Returns
+    -------
+    hist : ndarray
+        Counts in each bin, with shape (n_columns, n_bins)
+    """
+    n_rows, n_columns = values.shape
+    n_bins = edges.size - 1
+    norm = n_bins / (edges[-1] - edges[0])
+    hist = np.zeros((n_columns, n_bins), dtype=np.int64)
+    for i in range(n_rows):
+        for j in range(n_columns):
+            index = _bin_index(values[i, j], edges, norm)
+            if index >= 0:
+                hist[j, index] += 1
+    return hist
+
+
+@njit(cache=True)
+def _bin_index(value, edges, norm):
+    """Index of the uniform bin containing the value (-1 if outside the range).
+    Bins are half-open, except the last, which also includes the upper edge.
+    """
+    n_bins = edges.size - 1
+    if not edges[0] <= value <= edges[-1]:
+        return -1
+    index = min(int((value - edges[0]) * norm), n_bins - 1)
+    # Correct for rounding at the bin edges
+    if value < edges[index]:
+        index -= 1
+    elif value >= edges[index + 1] and index != n_bins - 1:
+        index += 1
+    return index
 
 
 class ChargeContainer:
-    def __init__(self, values: np.ndarray, n_bins: int, range_: Tuple[float, float]):
+    def __init__(
+        self,
+        values: np.ndarray,
+        n_bins: int,
+        range_: Tuple[float, float],
+        retain_values: bool = True,
+    ):
         """
         Container to pass the event charges to the Cost class. Internally, this
         class excludes the charges outside the range, and bins the charges -
@@ -19,10 +115,43 @@ class ChargeContainer:
             Number of histogram bins
         range_ : tuple
             Define range of charges to consider
+        retain_values : bool
+            Keep the charges within the range (required by UnbinnedNLL).
+            If False, only the histogram is stored and self.values is None,
+            saving memory for the binned Cost methods.
+        """
+        self.edges, self.between = self._uniform_bins(n_bins, range_)
+        filtered, self.hist = _filter_and_hist(values, self.edges, retain_values)
+        self.values = filtered if retain_values else None
+        self._cache_hist_invariants()
+
+    @staticmethod
+    def _uniform_bins(n_bins: int, range_: Tuple[float, float]):
+        """Obtain the edges and centers of the histogram bins"""
+        if n_bins < 1:
+            raise ValueError("n_bins must be positive")
+        if not np.isfinite(range_).all():
+            raise ValueError(f"Range {range_} is not finite")
+        if range_[0] >= range_[1]:
+            raise ValueError("Range maximum must be larger than the minimum")
+        edges = np.linspace(range_[0], range_[1], n_bins + 1)
+        width = (range_[1] - range_[0]) / n_bins
+        between = range_[0] + width * (np.arange(n_bins) + 0.5)
+        return edges, between
+
+    def _cache_hist_invariants(self):
+        """Precompute the quantities of the histogram that are invariant
+        across the iterations of the minimization
         """
-        self.values = values[(values >= range_[0]) & (values <= range_[1])]
-        self.hist, self.edges = np.histogram(values, bins=n_bins, range=range_)
-        self.between = (self.edges[1:] + self.edges[:-1]) / 2
+        self.hist_sum = float(self.hist.sum())
+        self.hist_gt5 = self.hist > 5
+        # Least-squares weight of each bin (bins with <= 5 counts are excluded)
+        self.hist_weight = np.divide(
+            1, self.hist, out=np.zeros(self.hist.shape), where=self.hist_gt5
+        )
+        self.hist_log_safe = np.log(
+            self.hist, out=np.zeros(self.hist.shape), where=self.hist > 0
+        )
 
     @classmethod
     def from_prebinned(cls, x: np.ndarray, y: np.ndarray):
@@ -46,4 +175,42 @@ class ChargeContainer:
         obj.edges = None
         obj.between = x
         obj.hist = y
+        obj._cache_hist_invariants()
         return obj
+
+    @classmethod
+    def from_columns(
+        cls, values: np.ndarray, n_bins: int, range_: Tuple[float, float]
+    ) -> List["ChargeContainer"]:
+        """
+        Histogram each column of a 2D array of charges (e.g. one column per
+        camera pixel) in a single pass over the array, which is much faster
+        than constructing a ChargeContainer from each (strided) column.
+        The charge values are not retained, so the resulting containers can
+        only be used with the binned Cost methods.
+
+        Parameters
+        ----------
+        values : ndarray
+            Array of charges with shape (n_events, n_columns)
+        n_bins : int
+            Number of histogram bins
+        range_ : tuple
+            Define range of charges to consider
+
+        Returns
+        -------
+        List[ChargeContainer]
+            A ChargeContainer for each column
+        """
+        edges, between = cls._uniform_bins(n_bins, range_)
+        containers = []
+        for hist in _hist_columns(values, edges):
+            obj = cls.__new__(cls)
+            obj.values = None
+            obj.edges = edges
+            obj.between = between
+            obj.hist = hist
+            obj._cache_hist_invariants()
+            containers.append(obj)
+        return containers
@@ -1,16 +1,16 @@
 """Common minimization cost functions altered to handle n_illuminations."""
 from spefit.pdf.base import PDF
-from spefit.common.basic import xlogy
 from spefit.container import ChargeContainer
-from typing import List
+from spefit.common.stats import chi2_sf
+from typing import List, Dict
 from numba import njit, vectorize, float64
+from math import log
 import numpy as np
 from abc import abstractmethod, ABCMeta
-from scipy.stats import distributions
 
 __all__ = [
-    "_sum_log_x",
     "_bin_nll",
+    "_scale",
     "_total_binned_nll",
     "_least_squares",
     "Cost",
@@ -19,13 +19,15 @@ __all__ = [
     "LeastSquares",
 ]
 
+# The cost kernels (and the PDF kernels they call) are deliberately serial
+# (no parallel=True/prange). A fit histogram typically holds ~60 bins, and the
+# illuminations are evaluated (and cached, see Cost.__call__) individually, so
+# thread dispatch would cost more than the reduction. Parallelism is instead
+# applied across pixels in CameraFitter, where each worker process runs an
+# independent fit and additional threads would oversubscribe the cores.
 
-@njit(fastmath=True)
-def _sum_log_x(x):
-    return np.sum(np.log(x))
 
-
-@vectorize([float64(float64, float64)], fastmath=True)
+@vectorize([float64(float64, float64)], fastmath=True, cache=True)
 def _bin_nll(f_y, d_y):
     """Negative log-likelihood for N counts in a charge bin given the expected
     value, assuming the bin counts are Poisson distributed.
@@ -44,11 +46,34 @@ def _bin_nll(f_y, d_y):
     -------
     ndarray or float
     """
-    return f_y if d_y == 0 else f_y - d_y - xlogy(d_y, f_y / d_y)
+    # d_y is non-zero in the second branch, so no xlogy guard is required
+    return f_y if d_y == 0 else f_y - d_y - d_y * log(f_y / d_y)
+
+
+@njit(fastmath=True, cache=True)
+def _scale(f_y, d_sum):
+    """Factor to scale the PDF result by to obtain the expected number of
+    counts in the bins
+
+    Parameters
+    ----------
+    f_y : ndarray
+        Expected bin counts from the PDF
+    d_sum : float
+        Sum of the measured bin counts
+
+    Returns
+    -------
+    float
+    """
+    sum_f = 0.0
+    for i in range(f_y.size):
+        sum_f += f_y[i]
+    return d_sum / sum_f
 
 
-@njit(fastmath=True)
-def _total_binned_nll(f_y, d_y):
+@njit(fastmath=True, cache=True)
+def _total_binned_nll(f_y, d_y, d_sum, d_log):
     """Sum over the likelihood of all bins, after scaling the PDF result to the
     expected number of counts in the bins.
 
@@ -58,17 +83,28 @@ def _total_binned_nll(f_y, d_y):
         Expected bin counts from the PDF
     d_y : ndarray
         Measured bin counts
+    d_sum : float
+        Sum of the measured bin counts
+    d_log : ndarray
+        Log of the measured bin counts (0 for empty bins)
 
     Returns
     -------
     float
     """
-    scale = np.sum(d_y) / np.sum(f_y)
-    return np.sum(_bin_nll(f_y * scale, d_y))
-
-
-@njit(fastmath=True)
-def _least_squares(f_y, d_y):
+    scale = _scale(f_y, d_sum)
+    nll = 0.0
+    for i in range(f_y.size):
+        f_ys = f_y[i] * scale
+        if d_y[i] == 0:
+            nll += f_ys
+        else:
+            nll += f_ys - d_y[i] - d_y[i] * (log(f_ys) - d_log[i])
+    return nll
+
+
+@njit(fastmath=True, cache=True)
+def _least_squares(f_y, d_y, d_sum, d_weight):
     """Extract the least squared chi2, after scaling the PDF result to the
     expected number of counts in the bins.
     Require more than 5 counts per bin, in order to enable the Gaussian
@@ -80,15 +116,20 @@ def _least_squares(f_y, d_y):
         Expected bin counts from the PDF
     d_y : ndarray
         Measured bin counts
+    d_sum : float
+        Sum of the measured bin counts
+    d_weight : ndarray
+        Weight of each bin: 1/d_y for bins with more than 5 counts, else 0
 
     Returns
     -------
     float
     """
-    scale = np.sum(d_y) / np.sum(f_y)
-    f_ys = f_y * scale
-    gt5 = d_y > 5
-    return np.sum((d_y[gt5] - f_ys[gt5]) ** 2 / d_y[gt5])
+    scale = _scale(f_y, d_sum)
+    chi2 = 0.0
+    for i in range(f_y.size):
+        chi2 += d_weight[i] * (d_y[i] - f_y[i] * scale) ** 2
+    return chi2
 
 
 class Cost(metaclass=ABCMeta):
@@ -113,12 +154,20 @@ class Cost(metaclass=ABCMeta):
         """
         self._pdf = pdf
         self._n_free_parameters = self._pdf.n_free_parameters
+        # The PDF parameters are not expected to change once passed to a Cost
+        self._iminuit_kwargs = self._pdf.iminuit_kwargs
+        self._parameter_names = self._pdf.parameter_names
         self._charges = charges
         self._n_illuminations = len(charges)
         if self._n_illuminations != pdf.n_illuminations:
             raise ValueError("Charges must be a list of length n_illuminations")
 
-    @abstractmethod
+        # Cost of each illumination, and the parameters it was evaluated for.
+        # Minuit's numerical derivatives vary one parameter at a time, leaving
+        # the illuminations that do not depend on it unchanged.
+        self._cached_parameters = [None] * self._n_illuminations
+        self._cached_cost = [0.0] * self._n_illuminations
+
     def __call__(self, parameters: np.ndarray) -> float:
         """Evaluate the cost function for a particular set of parameter values
 
@@ -132,14 +181,50 @@ class Cost(metaclass=ABCMeta):
         -------
         float
         """
+        if np.isnan(parameters).any():
+            return np.inf
+        cost = 0
+        for i in range(self._n_illuminations):
+            function_parameters = self._pdf._lookup_parameters(parameters, i)
+            key = function_parameters.tolist()
+            if key != self._cached_parameters[i]:
+                self._cached_parameters[i] = key
+                self._cached_cost[i] = self._illumination_cost(function_parameters, i)
+            cost += self._cached_cost[i]
+        return cost
+
+    def _illumination_cost(
+        self, function_parameters: np.ndarray, i_illumination: int
+    ) -> float:
+        """Evaluate the contribution to the cost function from a single
+        illumination
+
+        Subclasses that instead override __call__ do not need to implement
+        this method.
+
+        Parameters
+        ----------
+        function_parameters : ndarray
+            Parameter values of the PDF function for this illumination, as
+            returned by `pdf._lookup_parameters`
+        i_illumination : int
+            Illumination index to evaluate the cost for
+
+        Returns
+        -------
+        float
+        """
+        raise NotImplementedError(
+            "Cost subclasses must implement either _illumination_cost or __call__"
+        )
 
     @property
     def iminuit_kwargs(self):
-        return self._pdf.iminuit_kwargs
+        return self._iminuit_kwargs
 
     @property
     def parameter_names(self):
-        return self._pdf.parameter_names
+        return self._parameter_names
 
     @property
     @abstractmethod
@@ -154,7 +239,25 @@ class Cost(metaclass=ABCMeta):
         return self.chi2(parameters) / self.dof
 
     def p_value(self, parameters: np.ndarray):
-        return distributions.chi2.sf(self.chi2(parameters), self.dof)
+        return chi2_sf(self.chi2(parameters), self.dof)
+
+    def scores(self, parameters: np.ndarray) -> Dict[str, float]:
+        """Obtain the chi2, reduced_chi2 and p_value scores of the fit, from a
+        single evaluation of the chi2
+
+        Parameters
+        ----------
+        parameters : ndarray
+            Array of the parameter values for the fit function (all illuminations)
+            Must be ordered according to the `pdf._parameters`
+
+        Returns
+        -------
+        dict
+        """
+        chi2 = self.chi2(parameters)
+        dof = self.dof
+        return dict(chi2=chi2, reduced_chi2=chi2 / dof, p_value=chi2_sf(chi2, dof))
 
     @classmethod
     def from_name(cls, name: str, *args, **kwargs):
@@ -181,14 +284,9 @@ class UnbinnedNLL(Cost):
                 )
         super().__init__(pdf, charges)
 
-    def __call__(self, parameters):
-        if np.isnan(parameters).any():
-            return np.inf
-        likelihood = 0
-        for i in range(self._n_illuminations):
-            f = self._pdf(self._charges[i].values, parameters, i)
-            likelihood += -_sum_log_x(f)
-        return likelihood
+    def _illumination_cost(self, function_parameters, i_illumination):
+        values = self._charges[i_illumination].values
+        return -self._pdf._logpdf_sum(values, function_parameters)
 
     @property
     def dof(self):
@@ -209,14 +307,10 @@ class BinnedNLL(Cost):
 
     errordef = 0.5
 
-    def __call__(self, parameters):
-        if np.isnan(parameters).any():
-            return np.inf
-        likelihood = 0
-        for i in range(self._n_illuminations):
-            f_y = self._pdf(self._charges[i].between, parameters, i)
-            likelihood += _total_binned_nll(f_y, self._charges[i].hist)
-        return likelihood
+    def _illumination_cost(self, function_parameters, i_illumination):
+        c = self._charges[i_illumination]
+        f_y = self._pdf.function(c.between, *function_parameters)
+        return _total_binned_nll(f_y, c.hist, c.hist_sum, c.hist_log_safe)
 
     @property
     def dof(self):
@@ -233,18 +327,14 @@ class LeastSquares(Cost):
 
     errordef = 1
 
-    def __call__(self, parameters):
-        if np.isnan(parameters).any():
-            return np.inf
-        chi2 = 0
-        for i in range(self._n_illuminations):
-            f_y = self._pdf(self._charges[i].between, parameters, i)
-            chi2 += _least_squares(f_y, self._charges[i].hist)
-        return chi2
+    def _illumination_cost(self, function_parameters, i_illumination):
+        c = self._charges[i_illumination]
+        f_y = self._pdf.function(c.between, *function_parameters)
+        return _least_squares(f_y, c.hist, c.hist_sum, c.hist_weight)
 
     @property
     def dof(self):
-        n = sum([(d.hist > 5).sum() for d in self._charges])
+        n = sum([d.hist_gt5.sum() for d in self._charges])
         m = self._n_free_parameters
         return n - m
 
@@ -65,7 +65,7 @@ def find_spe_peaks(x, y, min_n_peaks: int = 2, max_n_peaks: int = 5):
     return peak_x, peak_y, peak_sigma
 
 
-@njit(fastmath=True)
+@njit(fastmath=True, cache=True)
 def calculate_peak_ratio(k, lambda_, sigma0, sigma1):
     """
     Relationship between the height ratio of the peaks, the average
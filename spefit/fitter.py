@@ -2,13 +2,32 @@ from spefit import PDF, Cost, ChargeContainer
 from typing import List, Tuple, Dict
 import iminuit
 import numpy as np
-from tqdm.auto import trange
+from tqdm.auto import tqdm, trange
 import warnings
-from multiprocessing import Pool, Manager
-from functools import partial
+from multiprocessing import Pool
 
 __all__ = ["minimize_with_iminuit", "CameraFitter"]
 
+# State of each CameraFitter.multiprocess worker process, set once by the Pool
+# initializer so that it is not pickled with every task
+_worker_fitter = None
+_worker_charge_arrays = None
+_worker_camera_charges = None
+
+
+def _initialize_worker(fitter, charge_arrays, camera_charges):
+    global _worker_fitter, _worker_charge_arrays, _worker_camera_charges
+    _worker_fitter = fitter
+    _worker_charge_arrays = charge_arrays
+    _worker_camera_charges = camera_charges
+
+
+def _fit_pixel_worker(pixel):
+    charges = _worker_fitter._pixel_charges(
+        _worker_charge_arrays, pixel, _worker_camera_charges
+    )
+    return _worker_fitter._fit_pixel(charges, pixel)
+
 
 def minimize_with_iminuit(cost: Cost) -> (Dict[str, float], Dict[str, float]):
     """Minimize the Cost definition using iminuit"""
@@ -65,17 +84,47 @@ class CameraFitter:
         self._cost_name = cost_name
         self._n_bins = n_bins
         self._range = range_
+        # Common x values for the fit_y plotting arrays of every pixel
+        self._fit_x = np.linspace(range_[0], range_[1], n_bins * 10)
 
-        manager = Manager()
-        self.pixel_values = manager.dict()
-        self.pixel_errors = manager.dict()
-        self.pixel_scores = manager.dict()
-        self.pixel_arrays = manager.dict()
+        self.pixel_values = {}
+        self.pixel_errors = {}
+        self.pixel_scores = {}
+        self.pixel_arrays = {}
 
     @property
     def n_illuminations(self):
         return self._pdf.n_illuminations
 
+    @staticmethod
+    def _pixel_dict_to_arrays(pixel_dict: Dict[int, Dict[str, float]]):
+        """Convert a dict (keyed by pixel) of dicts (keyed by name) into a dict
+        of arrays indexed by pixel. Pixels without a result are NaN.
+        """
+        n_pixels = max(pixel_dict) + 1 if pixel_dict else 0
+        arrays = {}
+        for pixel, result in pixel_dict.items():
+            for name, value in result.items():
+                if name not in arrays:
+                    arrays[name] = np.full(n_pixels, np.nan)
+                arrays[name][pixel] = value
+        return arrays
+
+    @property
+    def pixel_values_arrays(self) -> Dict[str, np.ndarray]:
+        """Fit parameter values, as an array per parameter indexed by pixel"""
+        return self._pixel_dict_to_arrays(self.pixel_values)
+
+    @property
+    def pixel_errors_arrays(self) -> Dict[str, np.ndarray]:
+        """Fit parameter errors, as an array per parameter indexed by pixel"""
+        return self._pixel_dict_to_arrays(self.pixel_errors)
+
+    @property
+    def pixel_scores_arrays(self) -> Dict[str, np.ndarray]:
+        """Fit scores, as an array per score indexed by pixel"""
+        return self._pixel_dict_to_arrays(self.pixel_scores)
+
     def _update_initial(self, charges: List[ChargeContainer]):
         """
         Update the initial parameters of the minimization for each pixel based
@@ -86,39 +135,126 @@ class CameraFitter:
 
     def _apply_pixel(self, charge_arrays: List[np.ndarray], pixel: int):
         """
-        Process a single pixel and store result into the
-        multiprocessing-managed dicts
+        Process a single pixel and store result into the self.pixel_* dicts
 
         Parameters
         ----------
         charge_arrays : List[ndarray]
             List of size n_illuminations, containing numpy arrays of
             shape (n_events, n_pixels)
+        pixel : int
+            Index of the pixel to process
         """
-        n_illuminations = self._pdf.n_illuminations
+        charges = self._pixel_charges(charge_arrays, pixel)
+        self._store_pixel(*self._fit_pixel(charges, pixel))
+
+    def _store_pixel(self, pixel, values, errors, scores, arrays):
+        """Store the result of _fit_pixel into the self.pixel_* dicts"""
+        self.pixel_values[pixel] = values
+        self.pixel_errors[pixel] = errors
+        self.pixel_scores[pixel] = scores
+        self.pixel_arrays[pixel] = arrays
+
+    def _camera_charges(self, charge_arrays: List[np.ndarray]):
+        """
+        Histogram the charges of all pixels up front, in a single pass over
+        each array, for the binned Cost methods
+
+        Parameters
+        ----------
+        charge_arrays : List[ndarray]
+            List of size n_illuminations, containing numpy arrays of
+            shape (n_events, n_pixels)
+
+        Returns
+        -------
+        List[List[ChargeContainer]] or None
+            ChargeContainers indexed by [pixel][illumination]. None if the
+            Cost requires the charge values (UnbinnedNLL), in which case the
+            containers are created per pixel.
+        """
+        if self._cost_name == "UnbinnedNLL":
+            return None
+        illumination_charges = [
+            ChargeContainer.from_columns(a, n_bins=self._n_bins, range_=self._range)
+            for a in charge_arrays
+        ]
+        return [list(charges) for charges in zip(*illumination_charges)]
+
+    def _pixel_charges(
+        self,
+        charge_arrays: List[np.ndarray],
+        pixel: int,
+        camera_charges: List[List[ChargeContainer]] = None,
+    ) -> List[ChargeContainer]:
+        """
+        Obtain the ChargeContainers of a single pixel
+
+        Parameters
+        ----------
+        charge_arrays : List[ndarray]
+            List of size n_illuminations, containing numpy arrays of
+            shape (n_events, n_pixels)
+        pixel : int
+            Index of the pixel
+        camera_charges : List[List[ChargeContainer]]
+            Optional result of self._camera_charges. If provided, the
+            charge_arrays are not read.
+
+        Returns
+        -------
+        List[ChargeContainer]
+            List of size n_illuminations
+        """
+        if camera_charges is not None:
+            return camera_charges[pixel]
+
+        retain_values = self._cost_name == "UnbinnedNLL"
         charges = []
-        for i in range(n_illuminations):
+        for i in range(self._pdf.n_illuminations):
             c = charge_arrays[i][:, pixel]
-            charges.append(ChargeContainer(c, n_bins=self._n_bins, range_=self._range))
+            charges.append(
+                ChargeContainer(
+                    c,
+                    n_bins=self._n_bins,
+                    range_=self._range,
+                    retain_values=retain_values,
+                )
+            )
+        return charges
+
+    def _fit_pixel(self, charges: List[ChargeContainer], pixel: int):
+        """
+        Process a single pixel
+
+        Parameters
+        ----------
+        charges : List[ChargeContainer]
+            List of size n_illuminations, containing the charges of the pixel
+        pixel : int
+            Index of the pixel to process
+
+        Returns
+        -------
+        tuple
+            (pixel, values, errors, scores, arrays)
+        """
+        n_illuminations = self._pdf.n_illuminations
 
         self._update_initial(charges)
 
         cost = Cost.from_name(self._cost_name, pdf=self._pdf, charges=charges)
         values, errors = minimize_with_iminuit(cost)
-        values_array = np.array(list(values.values()))
+        values_array = np.fromiter(values.values(), np.float64, len(values))
 
         # Obtain score of minimization
         try:
-            scores = dict(
-                chi2=cost.chi2(values_array),
-                reduced_chi2=cost.reduced_chi2(values_array),
-                p_value=cost.p_value(values_array),
-            )
+            scores = cost.scores(values_array)
         except ValueError:
             scores = dict(chi2=np.nan, reduced_chi2=np.nan, p_value=np.nan)
 
         # Obtain resulting arrays for plotting purposes
-        fit_x = np.linspace(self._range[0], self._range[1], self._n_bins * 10)
+        fit_x = self._fit_x
         arrays = []
         for i in range(n_illuminations):
             d = dict(
@@ -130,10 +266,7 @@ class CameraFitter:
             )
             arrays.append(d)
 
-        self.pixel_values[pixel] = values
-        self.pixel_errors[pixel] = errors
-        self.pixel_scores[pixel] = scores
-        self.pixel_arrays[pixel] = arrays
+        return pixel, values, errors, scores, arrays
 
     def multiprocess(self, charge_arrays: List[np.ndarray], n_processes: int):
         """
@@ -149,9 +282,30 @@ class CameraFitter:
         """
         print(f"Multiprocessing pixel SPE fit (n_processes = {n_processes})")
         _, n_pixels = charge_arrays[0].shape
-        apply = partial(self._apply_pixel, charge_arrays)
-        with Pool(n_processes) as pool:
-            pool.map(apply, trange(n_pixels))
+        if n_pixels == 0:
+            return
+
+        camera_charges = self._camera_charges(charge_arrays)
+        if camera_charges is not None:
+            charge_arrays = None  # Not required by the workers
+
+        with tqdm(total=n_pixels) as progress:
+            # Fit the first pixel in this process, compiling (or loading from
+            # the cache) the numba kernels once before the workers are started
+            charges = self._pixel_charges(charge_arrays, 0, camera_charges)
+            self._store_pixel(*self._fit_pixel(charges, 0))
+            progress.update()
+
+            # Send the pixels in chunks to amortize the IPC of each task, while
+            # keeping enough chunks per process to balance the load
+            chunksize = max(1, n_pixels // (n_processes * 8))
+            initargs = (self, charge_arrays, camera_charges)
+            with Pool(n_processes, _initialize_worker, initargs) as pool:
+                pixels = range(1, n_pixels)
+                results = pool.imap_unordered(_fit_pixel_worker, pixels, chunksize)
+                for result in results:
+                    self._store_pixel(*result)
+                    progress.update()
 
     def process(self, charge_arrays: List[np.ndarray]):
         """
@@ -164,5 +318,7 @@ class CameraFitter:
             shape (n_events, n_pixels)
         """
         _, n_pixels = charge_arrays[0].shape
+        camera_charges = self._camera_charges(charge_arrays)
         for pixel in trange(n_pixels):
-            self._apply_pixel(charge_arrays, pixel)
+            charges = self._pixel_charges(charge_arrays, pixel, camera_charges)
+            self._store_pixel(*self._fit_pixel(charges, pixel))
@@ -1,9 +1,13 @@
+from spefit.common.basic import sum_log
 from copy import copy
 from typing import Callable, Tuple, Dict, List
 import numpy as np
 
 __all__ = ["PDFParameter", "PDF"]
 
+# Number of values evaluated at once in PDF.logpdf_sum (fits within L2 cache)
+LOGPDF_BLOCK_SIZE = 16384
+
 
 class PDFParameter:
     def __init__(
@@ -88,6 +92,9 @@ class PDF:
         self._function = function
         result = self._prepare_parameters(parameters, n_illuminations)
         self._parameters, self._parameter_is_multi, self._lookup = result
+        # Row of the lookup for each illumination, split up front to avoid
+        # slicing the 2D lookup on every call
+        self._lookup_rows = list(self._lookup)
 
     def __call__(self, x: np.ndarray, parameters: np.ndarray, i_illumination: int):
         """Evaluates the PDF of the fit function for a particular illumination
@@ -108,11 +115,47 @@ class PDF:
         """
         return self._function(x, *self._lookup_parameters(parameters, i_illumination))
 
+    def logpdf_sum(
+        self, x: np.ndarray, parameters: np.ndarray, i_illumination: int
+    ) -> float:
+        """Evaluates the sum of the log of the PDF for a particular illumination
+
+        The values are streamed through the PDF in blocks of
+        LOGPDF_BLOCK_SIZE, such that the intermediate PDF result remains in
+        cache and is never materialized for the full array of values.
+
+        Parameters
+        ----------
+        x : ndarray
+            Values to evaluate the fit function at
+        parameters : ndarray
+            Array of the parameter values for the fit function (all illuminations)
+            Must be ordered according to the `self._parameters`
+        i_illumination : int
+            Illumination index to evaluate the fit function for
+
+        Returns
+        -------
+        float
+        """
+        function_parameters = self._lookup_parameters(parameters, i_illumination)
+        return self._logpdf_sum(x, function_parameters)
+
+    def _logpdf_sum(self, x: np.ndarray, function_parameters: np.ndarray) -> float:
+        """As logpdf_sum, for parameters already extracted with
+        _lookup_parameters
+        """
+        total = 0.0
+        for start in range(0, x.size, LOGPDF_BLOCK_SIZE):
+            x_block = x[start : start + LOGPDF_BLOCK_SIZE]
+            total += sum_log(self._function(x_block, *function_parameters))
+        return total
+
     def _lookup_parameters(self, parameters: np.ndarray, i_illumination: int):
         """Extract the correct parameters from the array that correspond to the
         current illumination
         """
-        return parameters[self._lookup[i_illumination]]
+        return parameters[self._lookup_rows[i_illumination]]
 
     def _update_parameter(self, attribute, name, value):
         if name not in self._parameters:
@@ -141,7 +184,7 @@ class PDF:
     def _prepare_parameters(parameters, n_illuminations):
         parameter_dict = {}
         parameter_is_multi = {}
-        lookup = np.zeros((n_illuminations, len(parameters)), dtype=np.int)
+        lookup = np.zeros((n_illuminations, len(parameters)), dtype=np.int64)
         i_lookup = 0
         for i_param, (name, param) in enumerate(parameters.items()):
             if param.multi:
@@ -179,6 +222,12 @@ class PDF:
     def initial(self) -> Dict[str, float]:
         return {n: p.initial for n, p in self.parameters.items()}
 
+    @property
+    def initial_array(self) -> np.ndarray:
+        """Initial values of the parameters, ordered as expected by __call__"""
+        parameters = self._parameters.values()
+        return np.fromiter((p.initial for p in parameters), np.float64, len(parameters))
+
     @property
     def n_free_parameters(self) -> int:
         return sum([not p.fixed for p in self.parameters.values()])
@@ -1,8 +1,8 @@
 from spefit.pdf.base import PDF, PDFParameter
-from spefit.common.stats import poisson, normal_pdf
+from spefit.common.stats import normal_mixture_pdf
 from numba import njit
 from math import exp, sqrt
-from functools import partial
+import numpy as np
 
 __all__ = ["PMTSingleGaussian", "pmt_single_gaussian"]
 
@@ -20,7 +20,7 @@ class PMTSingleGaussian(PDF):
             Set to True if no pedestal peak exists in the charge spectrum
             (e.g. when triggering on a threshold or "dark counting")
         """
-        function = partial(pmt_single_gaussian, disable_pedestal=disable_pedestal)
+        function = _pmt_single_gaussian_kernels[bool(disable_pedestal)]
         parameters = dict(
             eped=PDFParameter(initial=0, limits=(-2, 2)),
             eped_sigma=PDFParameter(initial=0.1, limits=(0, 2)),
@@ -31,7 +31,7 @@ class PMTSingleGaussian(PDF):
         super().__init__(n_illuminations, function, parameters)
 
 
-@njit(fastmath=True)
+@njit(fastmath=True, cache=True)
 def pmt_single_gaussian(x, eped, eped_sigma, pe, pe_sigma, lambda_, disable_pedestal):
     """Simple description of the SPE spectrum PDF for a traditional
     Photomultiplier Tube, with the underlying 1 photoelectron PDF described by
@@ -60,15 +60,28 @@ def pmt_single_gaussian(x, eped, eped_sigma, pe, pe_sigma, lambda_, disable_pede
     spectrum : ndarray
         The y values of the total spectrum.
     """
+    # Weight, mean and sigma of each peak, summed by normal_mixture_pdf
+    weight = np.empty(100)
+    mean = np.empty(100)
+    sigma = np.empty(100)
+
     # Obtain pedestal peak
-    p_ped = 0 if disable_pedestal else exp(-lambda_)
-    spectrum = p_ped * normal_pdf(x, eped, eped_sigma)
+    p = exp(-lambda_)  # Poisson probability of 0 photoelectrons
+    weight[0] = 0 if disable_pedestal else p
+    mean[0] = eped
+    sigma[0] = eped_sigma
+    n_peaks = 1
+
+    # Variance of the k-th peak, k * pe_sigma ** 2 + eped_sigma ** 2, is
+    # accumulated one pe_sigma ** 2 at a time
+    pe_variance = pe_sigma ** 2
+    variance = eped_sigma ** 2
 
     p_max = 0  # Track when the peak probabilities start to become insignificant
 
     # Loop over the possible total number of photoelectrons
     for k in range(1, 100):
-        p = poisson(k, lambda_)  # Probability to get k avalanches
+        p *= lambda_ / k  # Probability to get k avalanches (Poisson recurrence)
 
         # Skip insignificant probabilities
         if p > p_max:
@@ -76,10 +89,30 @@ def pmt_single_gaussian(x, eped, eped_sigma, pe, pe_sigma, lambda_, disable_pede
         elif p < 1e-4:
             break
 
+        weight[n_peaks] = p
+        mean[n_peaks] = eped + k * pe
         # Combine spread of pedestal and pe peaks
-        total_sigma = sqrt(k * pe_sigma ** 2 + eped_sigma ** 2)
+        variance += pe_variance
+        sigma[n_peaks] = sqrt(variance)
+        n_peaks += 1
+
+    return normal_mixture_pdf(x, weight[:n_peaks], mean[:n_peaks], sigma[:n_peaks])
+
+
+def _specialize_pmt_single_gaussian(disable_pedestal):
+    """Obtain pmt_single_gaussian with disable_pedestal fixed at compile time, so that
+    it does not need to be bound (e.g. with functools.partial) on every call
+    """
+
+    @njit(fastmath=True, cache=True)
+    def function(x, eped, eped_sigma, pe, pe_sigma, lambda_):
+        return pmt_single_gaussian(
+            x, eped, eped_sigma, pe, pe_sigma, lambda_, disable_pedestal
+        )
+
+    return function
 
-        # Evaluate probability at each value of x
-        spectrum += p * normal_pdf(x, eped + k * pe, total_sigma)
 
-    return spectrum
+_pmt_single_gaussian_kernels = {
+    value: _specialize_pmt_single_gaussian(value) for value in (False, True)
+}
@@ -1,11 +1,10 @@
 from spefit.pdf.base import PDF, PDFParameter
-from spefit.common.stats import poisson, normal_pdf
-from spefit.common.basic import binom
-from numba import njit
-from math import exp, sqrt
-from functools import partial
+from spefit.common.stats import normal_mixture_pdf, log_factorial, poisson
+from numba import njit, vectorize, float64, int64
+from math import exp, sqrt, log, log1p
+import numpy as np
 
-__all__ = ["SiPMGentile", "sipm_gentile"]
+__all__ = ["SiPMGentile", "gentile_probability", "sipm_gentile"]
 
 
 class SiPMGentile(PDF):
@@ -22,7 +21,7 @@ class SiPMGentile(PDF):
             Set to True if no pedestal peak exists in the charge spectrum
             (e.g. when triggering on a threshold or "dark counting")
         """
-        function = partial(sipm_gentile, disable_pedestal=disable_pedestal)
+        function = _sipm_gentile_kernels[bool(disable_pedestal)]
         parameters = dict(
             eped=PDFParameter(initial=0, limits=(-2, 2)),
             eped_sigma=PDFParameter(initial=0.1, limits=(0, 2)),
@@ -34,7 +33,60 @@ class SiPMGentile(PDF):
         super().__init__(n_illuminations, function, parameters)
 
 
-@njit(fastmath=True)
+@vectorize([float64(int64, float64, float64)], fastmath=True, cache=True)
+def gentile_probability(k, lambda_, opct):
+    """Probability for a total of k fired cells, considering all the possible
+    combinations of j initial fired cells (Poisson distributed) with k - j
+    additional cells fired by optical crosstalk (Gentile 2010):
+
+    P(k) = sum_{j=1}^{k} Pois(j; lambda_) (1-opct)^j opct^(k-j) C(k-1, j-1)
+
+    Successive terms of the sum are related by the ratio
+    lambda_ (1-opct) (k-j+1) / (opct j (j-1)), so the sum is obtained with a
+    single exp and a multiplication per term. To avoid underflow, the
+    iteration starts from the larger of the two end terms (j=1 or j=k).
+
+    Parameters
+    ----------
+    k : int
+        Total number of fired cells
+    lambda_ : float
+        Poisson mean (average illumination in p.e.)
+    opct : float
+        Optical crosstalk probability
+
+    Returns
+    -------
+    probability : float
+    """
+    if k <= 0:
+        return exp(-lambda_) if k == 0 else 0.0
+    if lambda_ == 0 or opct == 1:
+        return 0.0
+    if opct == 0:
+        return poisson(k, lambda_)
+
+    log_lambda = log(lambda_)
+    log_1m_opct = log1p(-opct)
+    log_first = log_lambda - lambda_ + log_1m_opct + (k - 1) * log(opct)
+    log_last = k * (log_lambda + log_1m_opct) - lambda_ - log_factorial(k)
+
+    a = lambda_ * (1 - opct) / opct
+    term = 1.0
+    total = 1.0
+    if log_first >= log_last:
+        for j in range(2, k + 1):
+            term *= a * (k - j + 1) / (j * (j - 1))
+            total += term
+        return exp(log_first) * total
+    else:
+        for j in range(k, 1, -1):
+            term *= j * (j - 1) / (a * (k - j + 1))
+            total += term
+        return exp(log_last) * total
+
+
+@njit(fastmath=True, cache=True)
 def sipm_gentile(x, eped, eped_sigma, pe, pe_sigma, opct, lambda_, disable_pedestal):
     """PDF for the SPE spectrum of a SiPM as defined in Gentile 2010
     http://adsabs.harvard.edu/abs/2010arXiv1006.3263G
@@ -65,26 +117,30 @@ def sipm_gentile(x, eped, eped_sigma, pe, pe_sigma, opct, lambda_, disable_pedes
     spectrum : ndarray
         The y values of the total spectrum
     """
+    # Weight, mean and sigma of each peak, summed by normal_mixture_pdf
+    weight = np.empty(100)
+    mean = np.empty(100)
+    sigma = np.empty(100)
+
     # Obtain pedestal peak
-    p_ped = 0 if disable_pedestal else exp(-lambda_)
-    spectrum = p_ped * normal_pdf(x, eped, eped_sigma)
+    weight[0] = 0 if disable_pedestal else exp(-lambda_)
+    mean[0] = eped
+    sigma[0] = eped_sigma
+    n_peaks = 1
+
+    # Variance of the k-th peak, k * pe_sigma ** 2 + eped_sigma ** 2, is
+    # accumulated one pe_sigma ** 2 at a time
+    pe_variance = pe_sigma ** 2
+    variance = eped_sigma ** 2
 
     pk_max = 0  # Track when the peak probabilities start to become insignificant
 
     # Loop over the possible total number of cells fired
     for k in range(1, 100):
-        pk = 0
-        for j in range(1, k + 1):
-            pj = poisson(j, lambda_)  # Probability for j initial fired cells
-
-            # Skip insignificant probabilities
-            if pj < 1e-4:
-                continue
-
-            # Sum the probability from the possible combinations which result
-            # in a total of k fired cells to get the total probability of k
-            # fired cells
-            pk += pj * pow(1 - opct, j) * pow(opct, k - j) * binom(k - 1, j - 1)
+        # Sum the probability from the possible combinations which result
+        # in a total of k fired cells to get the total probability of k
+        # fired cells
+        pk = gentile_probability(k, lambda_, opct)
 
         # Skip insignificant probabilities
         if pk > pk_max:
@@ -92,10 +148,30 @@ def sipm_gentile(x, eped, eped_sigma, pe, pe_sigma, opct, lambda_, disable_pedes
         elif pk < 1e-4:
             break
 
+        weight[n_peaks] = pk
+        mean[n_peaks] = eped + k * pe
         # Combine spread of pedestal and pe peaks
-        total_sigma = sqrt(k * pe_sigma ** 2 + eped_sigma ** 2)
+        variance += pe_variance
+        sigma[n_peaks] = sqrt(variance)
+        n_peaks += 1
+
+    return normal_mixture_pdf(x, weight[:n_peaks], mean[:n_peaks], sigma[:n_peaks])
+
+
+def _specialize_sipm_gentile(disable_pedestal):
+    """Obtain sipm_gentile with disable_pedestal fixed at compile time, so that
+    it does not need to be bound (e.g. with functools.partial) on every call
+    """
+
+    @njit(fastmath=True, cache=True)
+    def function(x, eped, eped_sigma, pe, pe_sigma, opct, lambda_):
+        return sipm_gentile(
+            x, eped, eped_sigma, pe, pe_sigma, opct, lambda_, disable_pedestal
+        )
+
+    return function
 
-        # Evaluate probability at each value of x
-        spectrum += pk * normal_pdf(x, eped + k * pe, total_sigma)
 
-    return spectrum
+_sipm_gentile_kernels = {
+    value: _specialize_sipm_gentile(value) for value in (False, True)
+}
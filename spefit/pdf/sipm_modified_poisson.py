@@ -1,8 +1,8 @@
 from spefit.pdf.base import PDF, PDFParameter
-from spefit.common.stats import normal_pdf
+from spefit.common.stats import normal_mixture_pdf, log_factorial
 from numba import njit, vectorize, float64, int64
-from math import exp, sqrt, lgamma, log
-from functools import partial
+from math import exp, sqrt, log
+import numpy as np
 
 __all__ = ["SiPMModifiedPoisson", "modified_poisson", "sipm_mpoisson"]
 
@@ -20,7 +20,7 @@ class SiPMModifiedPoisson(PDF):
             Set to True if no pedestal peak exists in the charge spectrum
             (e.g. when triggering on a threshold or "dark counting")
         """
-        function = partial(sipm_mpoisson, disable_pedestal=disable_pedestal)
+        function = _sipm_mpoisson_kernels[bool(disable_pedestal)]
         parameters = dict(
             eped=PDFParameter(initial=0, limits=(-2, 2)),
             eped_sigma=PDFParameter(initial=0.1, limits=(0, 2)),
@@ -32,7 +32,7 @@ class SiPMModifiedPoisson(PDF):
         super().__init__(n_illuminations, function, parameters)
 
 
-@vectorize([float64(int64, float64, float64)], fastmath=True)
+@vectorize([float64(int64, float64, float64)], fastmath=True, cache=True)
 def modified_poisson(k, mu, opct):
     """Modified Poisson probabilities for a given mean number per event
     and per opct event.
@@ -52,10 +52,10 @@ def modified_poisson(k, mu, opct):
     """
     mu_dash = mu + k * opct
     # TODO: Use xlogy?
-    return mu * exp((k - 1) * log(mu_dash) - mu_dash - lgamma(k + 1))
+    return mu * exp((k - 1) * log(mu_dash) - mu_dash - log_factorial(k))
 
 
-@njit(fastmath=True)
+@njit(fastmath=True, cache=True)
 def sipm_mpoisson(x, eped, eped_sigma, pe, pe_sigma, opct, lambda_, disable_pedestal):
     """SPE spectrum PDF for a SiPM using Gaussian peaks with amplitudes given by
     a modified Poisson formula
@@ -87,9 +87,21 @@ def sipm_mpoisson(x, eped, eped_sigma, pe, pe_sigma, opct, lambda_, disable_pede
     spectrum : ndarray
         The y values of the total spectrum.
     """
+    # Weight, mean and sigma of each peak, summed by normal_mixture_pdf
+    weight = np.empty(100)
+    mean = np.empty(100)
+    sigma = np.empty(100)
+
     # Obtain pedestal peak
-    p_ped = 0 if disable_pedestal else exp(-lambda_)
-    spectrum = p_ped * normal_pdf(x, eped, eped_sigma)
+    weight[0] = 0 if disable_pedestal else exp(-lambda_)
+    mean[0] = eped
+    sigma[0] = eped_sigma
+    n_peaks = 1
+
+    # Variance of the k-th peak, k * pe_sigma ** 2 + eped_sigma ** 2, is
+    # accumulated one pe_sigma ** 2 at a time
+    pe_variance = pe_sigma ** 2
+    variance = eped_sigma ** 2
 
     p_max = 0  # Track when the peak probabilities start to become insignificant
 
@@ -103,10 +115,30 @@ def sipm_mpoisson(x, eped, eped_sigma, pe, pe_sigma, opct, lambda_, disable_pede
         elif p < 1e-4:
             break
 
+        weight[n_peaks] = p
+        mean[n_peaks] = eped + k * pe
         # Combine spread of pedestal and pe peaks
-        total_sigma = sqrt(k * pe_sigma ** 2 + eped_sigma ** 2)
+        variance += pe_variance
+        sigma[n_peaks] = sqrt(variance)
+        n_peaks += 1
+
+    return normal_mixture_pdf(x, weight[:n_peaks], mean[:n_peaks], sigma[:n_peaks])
+
+
+def _specialize_sipm_mpoisson(disable_pedestal):
+    """Obtain sipm_mpoisson with disable_pedestal fixed at compile time, so that
+    it does not need to be bound (e.g. with functools.partial) on every call
+    """
+
+    @njit(fastmath=True, cache=True)
+    def function(x, eped, eped_sigma, pe, pe_sigma, opct, lambda_):
+        return sipm_mpoisson(
+            x, eped, eped_sigma, pe, pe_sigma, opct, lambda_, disable_pedestal
+        )
+
+    return function
 
-        # Evaluate probability at each value of x
-        spectrum += p * normal_pdf(x, eped + k * pe, total_sigma)
 
-    return spectrum
+_sipm_mpoisson_kernels = {
+    value: _specialize_sipm_mpoisson(value) for value in (False, True)
+}
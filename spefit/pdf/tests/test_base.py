@@ -78,7 +78,7 @@ def test_lookup_parameters():
     )
     pdf = PDF(2, normal_pdf, parameters)
     pdf.update_parameters_initial(sigma1=0.3)
-    initial = np.array(list(pdf.initial.values()))
+    initial = pdf.initial_array
     assert np.array_equal(pdf._lookup_parameters(initial, 0), np.array([0, 0.1]))
     assert np.array_equal(pdf._lookup_parameters(initial, 1), np.array([0, 0.3]))
 
@@ -105,6 +105,21 @@ def test_call():
         pdf(x, [0, 0.1, 0.2], 1)
 
 
+def test_logpdf_sum():
+    parameters = dict(
+        mean=PDFParameter(initial=0, limits=(-2, 2)),
+        sigma=PDFParameter(initial=0.1, limits=(0, 2), multi=True),
+    )
+    pdf = PDF(2, normal_pdf, parameters)
+    values = np.array([0, 0.1, 0.2])
+
+    rng = np.random.default_rng(seed=0)
+    x = rng.normal(0, 0.1, 50000)  # Spans multiple blocks
+    for i in range(pdf.n_illuminations):
+        expected = np.sum(np.log(pdf(x, values, i)))
+        np.testing.assert_allclose(pdf.logpdf_sum(x, values, i), expected)
+
+
 def test_update_parameters_initial():
     parameters = dict(
         mean=PDFParameter(initial=0, limits=(-2, 2)),
@@ -219,6 +234,7 @@ def test_initial():
     pdf = PDF(2, normal_pdf, parameters)
     pdf.update_parameters_initial(sigma1=0.2)
     assert pdf.initial == dict(mean=0, sigma0=0.1, sigma1=0.2)
+    assert np.array_equal(pdf.initial_array, np.array([0, 0.1, 0.2]))
 
 
 def test_n_free_parameters():
@@ -268,7 +284,7 @@ def test_iminuit_kwargs():
 def test_pdf_subclasses(PDFSubclass):
     pdf = PDFSubclass(n_illuminations=1)
     x = np.linspace(-5, 100, 1000)
-    y = pdf(x, np.array(list(pdf.initial.values())), 0)
+    y = pdf(x, pdf.initial_array, 0)
     np.testing.assert_allclose(np.trapz(y, x), 1, rtol=1e-3)
 
 
@@ -277,7 +293,7 @@ def test_pdf_subclasses(PDFSubclass):
 def test_disable_pedestal(PDFSubclass):
     pdf = PDFSubclass(n_illuminations=1, disable_pedestal=True)
     x = np.linspace(-5, 100, 1000)
-    y = pdf(x, np.array(list(pdf.initial.values())), 0)
+    y = pdf(x, pdf.initial_array, 0)
     lambda_ = pdf.initial["lambda_0"]
     pedestal_contribution = np.exp(-lambda_)
     np.testing.assert_allclose(np.trapz(y, x), 1 - pedestal_contribution, rtol=1e-3)
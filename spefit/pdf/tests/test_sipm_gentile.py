@@ -1,5 +1,29 @@
-from spefit.pdf.sipm_gentile import sipm_gentile
+from spefit.pdf.sipm_gentile import gentile_probability, sipm_gentile
+from scipy.special import binom
+from scipy.stats import poisson
 import numpy as np
+import subprocess
+import sys
+import os
+
+
+def test_gentile_probability():
+    for lambda_ in [0.1, 1, 5]:
+        for opct in [0, 1e-12, 0.2, 0.9, 1]:
+            for k in range(1, 40):
+                j = np.arange(1, k + 1)
+                expected = np.sum(
+                    poisson.pmf(j, lambda_)
+                    * (1 - opct) ** j
+                    * opct ** (k - j)
+                    * binom(k - 1, j - 1)
+                )
+                actual = gentile_probability(k, lambda_, opct)
+                np.testing.assert_allclose(actual, expected, rtol=1e-8, atol=1e-300)
+
+    k = np.arange(200)
+    np.testing.assert_allclose(gentile_probability(k, 1, 0.4).sum(), 1, rtol=1e-6)
+    np.testing.assert_allclose(gentile_probability(0, 1, 0.4), np.exp(-1))
 
 
 def test_sipm_gentile():
@@ -11,3 +35,17 @@ def test_sipm_gentile():
     y = sipm_gentile(x, 0.0, 0.2, 1.0, 0.1, 0.2, lambda_, True)
     pedestal_contribution = np.exp(-lambda_)
     np.testing.assert_allclose(np.trapz(y, x), 1 - pedestal_contribution, rtol=1e-3)
+
+
+def test_gentile_probability_disable_jit():
+    # The ufunc must remain importable when numba's JIT is disabled (as in the
+    # coverage run), which requires it to only call other ufuncs
+    env = dict(os.environ, NUMBA_DISABLE_JIT="1")
+    code = (
+        "from spefit.pdf.sipm_gentile import gentile_probability;"
+        "print(gentile_probability(3, 1.0, 0.2))"
+    )
+    output = subprocess.check_output([sys.executable, "-c", code], env=env)
+    np.testing.assert_allclose(
+        float(output), gentile_probability(3, 1.0, 0.2), rtol=1e-8
+    )
@@ -1,10 +1,10 @@
-from spefit.container import ChargeContainer
+from spefit.container import _filter_and_hist, _hist_columns, ChargeContainer
 from spefit import UnbinnedNLL, BinnedNLL, LeastSquares
 import numpy as np
 import pytest
 
 
-def test_charge_container():
+def test_charge_container(example_pdf):
     rng = np.random.default_rng(seed=0)
     samples = rng.uniform(0, 100, 10000)
     bins = 100
@@ -13,6 +13,81 @@ def test_charge_container():
     assert (charge.values >= range_[0]).all()
     assert (charge.values <= range_[1]).all()
     assert charge.hist.size == bins
+    assert charge.hist_sum == charge.hist.sum()
+    assert np.array_equal(charge.hist_gt5, charge.hist > 5)
+    with np.errstate(divide="ignore"):
+        expected_log = np.where(charge.hist > 0, np.log(charge.hist), 0)
+    np.testing.assert_allclose(charge.hist_log_safe, expected_log)
+    gt5 = charge.hist > 5
+    np.testing.assert_allclose(charge.hist_weight[gt5], 1 / charge.hist[gt5])
+    assert (charge.hist_weight[~gt5] == 0).all()
+
+    edges = np.linspace(range_[0], range_[1], bins + 1)
+    np.testing.assert_allclose(charge.between, (edges[1:] + edges[:-1]) / 2)
+
+    binned = ChargeContainer(samples, n_bins=bins, range_=range_, retain_values=False)
+    assert binned.values is None
+    assert np.array_equal(binned.hist, charge.hist)
+    with pytest.raises(ValueError):
+        UnbinnedNLL(example_pdf, [binned, binned])
+
+    with pytest.raises(ValueError):
+        ChargeContainer(samples, n_bins=0, range_=range_)
+    with pytest.raises(ValueError):
+        ChargeContainer(samples, n_bins=bins, range_=(40, 40))
+    with pytest.raises(ValueError):
+        ChargeContainer(samples, n_bins=bins, range_=(60, 40))
+    with pytest.raises(ValueError):
+        ChargeContainer(samples, n_bins=bins, range_=(40, np.inf))
+
+
+def test_filter_and_hist():
+    rng = np.random.default_rng(seed=0)
+    range_ = (-1.3, 2.1)
+    n_bins = 37
+    edges = np.linspace(range_[0], range_[1], n_bins + 1)
+    samples = np.concatenate([rng.normal(0, 2, 10000), edges, [np.nan]])
+    filtered, hist = _filter_and_hist(samples, edges)
+    expected_hist, expected_edges = np.histogram(samples, n_bins, range_)
+    mask = (samples >= range_[0]) & (samples <= range_[1])
+    assert np.array_equal(filtered, samples[mask])
+    assert np.array_equal(hist, expected_hist)
+    assert np.array_equal(edges, expected_edges)
+
+    # Non-contiguous column of a 2D charge array
+    charge_array = samples[:-1].reshape((-1, 2))
+    filtered, hist = _filter_and_hist(charge_array[:, 1], edges)
+    expected_hist, _ = np.histogram(charge_array[:, 1], n_bins, range_)
+    assert np.array_equal(hist, expected_hist)
+
+
+def test_hist_columns():
+    rng = np.random.default_rng(seed=0)
+    range_ = (-1.3, 2.1)
+    n_bins = 37
+    edges = np.linspace(range_[0], range_[1], n_bins + 1)
+    charge_array = rng.normal(0, 2, (5000, 7))
+    charge_array[:38, 0] = edges
+    hist = _hist_columns(charge_array, edges)
+    assert hist.shape == (7, n_bins)
+    for i in range(7):
+        _, expected_hist = _filter_and_hist(charge_array[:, i], edges)
+        assert np.array_equal(hist[i], expected_hist)
+
+    containers = ChargeContainer.from_columns(charge_array, n_bins, range_)
+    assert len(containers) == 7
+    for i, charge in enumerate(containers):
+        expected = ChargeContainer(charge_array[:, i], n_bins, range_)
+        assert charge.values is None
+        assert np.array_equal(charge.hist, expected.hist)
+        assert np.array_equal(charge.edges, expected.edges)
+        assert np.array_equal(charge.between, expected.between)
+        assert charge.hist_sum == expected.hist_sum
+        assert np.array_equal(charge.hist_weight, expected.hist_weight)
+        assert np.array_equal(charge.hist_log_safe, expected.hist_log_safe)
+
+    with pytest.raises(ValueError):
+        ChargeContainer.from_columns(charge_array, 0, range_)
 
 
 def test_prebinned(example_pdf, example_params):
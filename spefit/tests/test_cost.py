@@ -1,6 +1,6 @@
 from spefit.cost import (
-    _sum_log_x,
     _bin_nll,
+    _scale,
     _total_binned_nll,
     _least_squares,
     UnbinnedNLL,
@@ -17,12 +17,6 @@ def incorrect():
     return np.array([0.6, 0.3, 0.4])
 
 
-def test_sum_log_x():
-    x = np.linspace(-100, 100, 1000)
-    with np.errstate(invalid="ignore"):
-        np.testing.assert_allclose(_sum_log_x(x), np.sum(np.log(x)))
-
-
 def test_bin_nll():
     assert _bin_nll(2, 0) == 2
     with np.errstate(divide="ignore", invalid="ignore"):
@@ -30,21 +24,41 @@ def test_bin_nll():
     assert _bin_nll(2, 1) < 2
 
 
+def test_scale():
+    f_y = np.array([0.1, 0.2, 0.3, 0.4])
+    d_y = np.array([5, 10, 15, 20])
+    np.testing.assert_allclose(_scale(f_y, d_y.sum()), 50)
+    np.testing.assert_allclose(f_y * _scale(f_y, d_y.sum()), d_y)
+
+
 def test_total_bin_likelihood(example_pdf, example_charges, example_params, incorrect):
-    f_y_correct = example_pdf(example_charges[0].between, example_params, 0)
-    f_y_incorrect = example_pdf(example_charges[0].between, incorrect, 0)
-    nll_correct = _total_binned_nll(f_y_correct, example_charges[0].hist)
-    nll_incorrect = _total_binned_nll(f_y_incorrect, example_charges[0].hist)
+    c = example_charges[0]
+    f_y_correct = example_pdf(c.between, example_params, 0)
+    f_y_incorrect = example_pdf(c.between, incorrect, 0)
+    nll_correct = _total_binned_nll(f_y_correct, c.hist, c.hist_sum, c.hist_log_safe)
+    nll_incorrect = _total_binned_nll(
+        f_y_incorrect, c.hist, c.hist_sum, c.hist_log_safe
+    )
     assert nll_correct < nll_incorrect
 
+    scale = c.hist_sum / f_y_correct.sum()
+    expected = np.sum(_bin_nll(f_y_correct * scale, c.hist.astype(float)))
+    np.testing.assert_allclose(nll_correct, expected)
+
 
 def test_least_squares_func(example_pdf, example_charges, example_params, incorrect):
-    f_y_correct = example_pdf(example_charges[0].between, example_params, 0)
-    f_y_incorrect = example_pdf(example_charges[0].between, incorrect, 0)
-    chi2_correct = _least_squares(f_y_correct, example_charges[0].hist)
-    chi2_incorrect = _least_squares(f_y_incorrect, example_charges[0].hist)
+    c = example_charges[0]
+    f_y_correct = example_pdf(c.between, example_params, 0)
+    f_y_incorrect = example_pdf(c.between, incorrect, 0)
+    chi2_correct = _least_squares(f_y_correct, c.hist, c.hist_sum, c.hist_weight)
+    chi2_incorrect = _least_squares(f_y_incorrect, c.hist, c.hist_sum, c.hist_weight)
     assert chi2_correct < chi2_incorrect
 
+    f_ys = f_y_correct * c.hist_sum / f_y_correct.sum()
+    gt5 = c.hist > 5
+    expected = np.sum((c.hist[gt5] - f_ys[gt5]) ** 2 / c.hist[gt5])
+    np.testing.assert_allclose(chi2_correct, expected)
+
 
 def test_unbinned_nll(example_pdf, example_charges, example_params, incorrect):
     # N illuminations mismatch
@@ -64,6 +78,9 @@ def test_unbinned_nll(example_pdf, example_charges, example_params, incorrect):
     with pytest.raises(ValueError):
         cost.p_value(example_params)
 
+    with pytest.raises(ValueError):
+        cost.scores(example_params)
+
 
 # noinspection DuplicatedCode
 def test_binned_nll(example_pdf, example_charges, example_params, incorrect):
@@ -73,6 +90,10 @@ def test_binned_nll(example_pdf, example_charges, example_params, incorrect):
     assert cost.chi2(example_params) < cost.chi2(incorrect)
     assert cost.reduced_chi2(example_params) < cost.reduced_chi2(incorrect)
     assert cost.p_value(example_params) > cost.p_value(incorrect)
+    scores = cost.scores(example_params)
+    assert scores["chi2"] == cost.chi2(example_params)
+    assert scores["reduced_chi2"] == cost.reduced_chi2(example_params)
+    assert scores["p_value"] == cost.p_value(example_params)
 
 
 # noinspection DuplicatedCode
@@ -83,11 +104,17 @@ def test_least_squares(example_pdf, example_charges, example_params, incorrect):
     assert cost.chi2(example_params) < cost.chi2(incorrect)
     assert cost.reduced_chi2(example_params) < cost.reduced_chi2(incorrect)
     assert cost.p_value(example_params) > cost.p_value(incorrect)
+    scores = cost.scores(example_params)
+    assert scores["chi2"] == cost.chi2(example_params)
+    assert scores["reduced_chi2"] == cost.reduced_chi2(example_params)
+    assert scores["p_value"] == cost.p_value(example_params)
 
 
 def test_from_name(example_pdf, example_charges):
     fit = Cost.from_name("BinnedNLL", example_pdf, example_charges)
     assert fit.__class__.__name__ == "BinnedNLL"
+    assert fit.iminuit_kwargs == example_pdf.iminuit_kwargs
+    assert fit.parameter_names == example_pdf.parameter_names
 
     with pytest.raises(ValueError):
         Cost.from_name("NULL", example_pdf, example_charges)
@@ -99,3 +126,50 @@ def test_nan(CostSubclass, example_pdf, example_charges, example_params, incorre
     example_params[0] = np.nan
     cost = CostSubclass(example_pdf, example_charges)
     assert np.isinf(cost(example_params))
+
+
+# noinspection PyPep8Naming
+@pytest.mark.parametrize("CostSubclass", Cost.__subclasses__())
+def test_illumination_cache(
+    CostSubclass, example_pdf, example_charges, example_params, incorrect
+):
+    cost = CostSubclass(example_pdf, example_charges)
+    evaluated = []
+    illumination_cost = cost._illumination_cost
+
+    def record(function_parameters, i_illumination):
+        evaluated.append(i_illumination)
+        return illumination_cost(function_parameters, i_illumination)
+
+    cost._illumination_cost = record
+
+    result = cost(example_params)
+    assert evaluated == [0, 1]
+    assert cost(example_params) == result
+    assert evaluated == [0, 1]
+
+    # Only the sigma of the second illumination is changed
+    params = example_params.copy()
+    params[2] = 0.5
+    result = cost(params)
+    assert evaluated == [0, 1, 1]
+    assert result == CostSubclass(example_pdf, example_charges)(params)
+
+    # Shared parameter changes all illuminations
+    assert cost(incorrect) == CostSubclass(example_pdf, example_charges)(incorrect)
+    assert evaluated == [0, 1, 1, 0, 1]
+
+
+def test_call_only_subclass(example_pdf, example_charges, example_params):
+    class CallOnlyCost(Cost):
+        errordef = 1
+        dof = 1
+
+        def __call__(self, parameters):
+            return 1.0
+
+        def chi2(self, parameters):
+            return self(parameters)
+
+    cost = CallOnlyCost(example_pdf, example_charges)
+    assert cost(example_params) == 1.0
@@ -55,6 +55,14 @@ def test_camera_fitter_process(example_pdf, example_params, charge_arrays):
         values_array = np.array(list(fitter.pixel_values[ipix].values()))
         np.testing.assert_allclose(values_array, example_params, rtol=1e-2)
 
+    values_arrays = fitter.pixel_values_arrays
+    assert list(values_arrays.keys()) == example_pdf.parameter_names
+    for i, name in enumerate(example_pdf.parameter_names):
+        assert values_arrays[name].shape == (n_pixels,)
+        np.testing.assert_allclose(values_arrays[name], example_params[i], rtol=1e-2)
+    assert (fitter.pixel_errors_arrays["mean"] > 0).all()
+    assert fitter.pixel_scores_arrays["p_value"].shape == (n_pixels,)
+
 
 # noinspection DuplicatedCode
 def test_camera_fitter_multiprocess(example_pdf, example_params, charge_arrays):